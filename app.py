@@ -1,37 +1,108 @@
+import asyncio
+import functools
+import hashlib
+import logging
 import os
+import queue
+import re
+import tempfile
+import threading
+import time
 import uuid
-from dataclasses import dataclass, asdict
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
 from typing import List, Optional
 
-from flask import Flask, render_template, request
+import numpy as np
+from flask import Flask, abort, redirect, render_template, request, send_from_directory, url_for
 from dotenv import load_dotenv
-from openai import OpenAI
+from openai import AsyncOpenAI
 from werkzeug.utils import secure_filename
 
 # Load environment variables
 load_dotenv()
 
-# OpenAI client
-client = OpenAI(
+# OpenAI client (async so a batch of prompts can be in flight at once)
+async_client = AsyncOpenAI(
     api_key=os.environ.get("OPENAI_API_KEY"),
 )
 
 app = Flask(__name__)
+logger = logging.getLogger(__name__)
 
 # ---------- File upload config ----------
 UPLOAD_FOLDER = os.path.join("static", "uploads")
-ALLOWED_EXTENSIONS = {"png", "jpg", "jpeg", "gif"}
+ALLOWED_EXTENSIONS = frozenset({"png", "jpg", "jpeg", "gif"})
+# leading bytes of PNG, JPEG and GIF files
+IMAGE_SIGNATURES = (b"\x89PNG\r\n\x1a\n", b"\xff\xd8\xff", b"GIF87a", b"GIF89a")
 
 app.config["UPLOAD_FOLDER"] = UPLOAD_FOLDER
+# photos are buffered in memory before the background write, so bigger ones
+# are dropped (the rest of the sign-up still goes through)
+MAX_PHOTO_BYTES = 8 * 1024 * 1024
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 
+# background disk writes for uploads, so /match doesn't wait on the filesystem
+io_pool = ThreadPoolExecutor(max_workers=4)
 
-def allowed_file(filename: str) -> bool:
-    return "." in filename and filename.rsplit(".", 1)[1].lower() in ALLOWED_EXTENSIONS
+
+def parse_upload(photo_file) -> Optional[str]:
+    # single parse of the upload name: lowercased extension if allowed, else None
+    _, ext = os.path.splitext(photo_file.filename or "")
+    ext = ext[1:].lower()
+    return ext if ext in ALLOWED_EXTENSIONS else None
+
+
+def _write_upload(path: str, data: bytes) -> None:
+    # write under a temp name in the same folder, then rename, so the served
+    # name only ever points at a complete file
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".", suffix=".part")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        # mkstemp creates 0600; give it the usual permissions of a saved upload
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def _log_upload_result(path: str, fut: Future) -> None:
+    exc = fut.exception()
+    if exc is not None:
+        logger.error("Failed to save photo %s", path, exc_info=exc)
+    else:
+        logger.debug("Saved photo as: %s", path)
 
 
 # ---------- In-memory "database" ----------
-@dataclass
+# Flask may serve requests on several threads; every mutation of the shared
+# registry below (and the scoring pool built from it) happens under this lock.
+registry_lock = threading.RLock()
+
+
+def _split_tokens(value: str) -> frozenset[str]:
+    # "Calc 2, Physics" -> {"calc 2", "physics"}
+    return frozenset(t for t in (part.strip() for part in value.lower().split(",")) if t)
+
+
+# small-int ids for categorical fields, so equality checks are int compares
+_interners: dict[str, dict[str, int]] = {
+    "study_style": {},
+    "vibe": {},
+}
+
+
+def intern(field_name: str, value: str) -> int:
+    # case-insensitive, same as the old .lower() == .lower() comparisons
+    ids = _interners[field_name]
+    with registry_lock:
+        return ids.setdefault(value.lower(), len(ids))
+
+
+@dataclass(slots=True)
 class StudentProfile:
     student_id: str   # USF Student ID
     name: str
@@ -44,57 +115,326 @@ class StudentProfile:
     goals: str
     photo_filename: str = ""   # stored image filename
 
+    # normalized ids and token sets used for matching, filled in once on creation
+    _study_style_id: int = field(init=False, repr=False, compare=False)
+    _vibe_id: int = field(init=False, repr=False, compare=False)
+    _subjects_set: frozenset[str] = field(init=False, repr=False, compare=False)
+    _availability_set: frozenset[str] = field(init=False, repr=False, compare=False)
+    _goals_words: frozenset[str] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        self._study_style_id = intern("study_style", self.study_style)
+        self._vibe_id = intern("vibe", self.vibe)
+        self._subjects_set = _split_tokens(self.subjects)
+        self._availability_set = _split_tokens(self.availability)
+        self._goals_words = frozenset(self.goals.lower().split())
+
 
 registered_students: List[StudentProfile] = []
+# student_id -> profile, kept alongside registered_students for O(1) lookups
+students_by_id: dict[str, StudentProfile] = {}
 # who this user liked / passed
 likes_by_user: dict[str, set[str]] = {}
+# reverse index: who liked this user, in the order they did (dict used as an
+# insertion-ordered set, so the dashboard lists requests in a stable order)
+liked_by: dict[str, dict[str, None]] = {}
+# both liked each other; filled in the moment a like becomes mutual
+mutuals_by_user: dict[str, set[str]] = {}
 passes_by_user: dict[str, set[str]] = {}
+# swipe queue: ids in sign-up order, plus how far each user has swiped through it
+all_ids: list[str] = []
+cursor_by_user: dict[str, int] = {}
 
 # simple in-memory chat: chat_id -> list of {"sender_id", "sender_name", "text"}
 chats: dict[str, list[dict]] = {}
 
 
+# ---------- Vectorized scoring pool ----------
+def _grown(arr: np.ndarray, needed: int) -> np.ndarray:
+    # double the length until `needed` fits, keeping the existing contents
+    size = max(len(arr), 1)
+    while size < needed:
+        size *= 2
+    if size == len(arr):
+        return arr
+    out = np.empty(size, dtype=arr.dtype)
+    out[: len(arr)] = arr
+    return out
+
+
+class TokenRows:
+    """Growable CSR matrix of token rows: row r's token ids are indices[indptr[r]:indptr[r+1]]."""
+
+    def __init__(self, capacity: int = 16):
+        self.vocab: dict[str, int] = {}
+        self.rows = 0
+        self.indptr = np.zeros(capacity + 1, dtype=np.int64)
+        self.indices = np.empty(4 * capacity, dtype=np.int32)
+
+    def append(self, tokens: frozenset[str]) -> None:
+        cols = [self.vocab.setdefault(t, len(self.vocab)) for t in tokens]
+        start = int(self.indptr[self.rows])
+        end = start + len(cols)
+        self.indptr = _grown(self.indptr, self.rows + 2)
+        self.indices = _grown(self.indices, end)
+        self.indices[start:end] = cols
+        self.indptr[self.rows + 1] = end
+        self.rows += 1
+
+    def overlap(self, tokens: frozenset[str]) -> np.ndarray:
+        """Shared-token count between `tokens` and every row (a CSR mat-vec)."""
+        # tokens nobody in the pool has never score, so they can be dropped
+        vec = np.zeros(len(self.vocab), dtype=np.int32)
+        for t in tokens:
+            col = self.vocab.get(t)
+            if col is not None:
+                vec[col] = 1
+
+        n = self.rows
+        hits = np.zeros(int(self.indptr[n]) + 1, dtype=np.int64)
+        np.cumsum(vec[self.indices[: self.indptr[n]]], out=hits[1:])
+        return hits[self.indptr[1 : n + 1]] - hits[self.indptr[:n]]
+
+
+class ProfileStore:
+    """Structure-of-arrays copy of registered_students (row i = registered_students[i]) for scoring."""
+
+    def __init__(self, capacity: int = 16):
+        self.size = 0
+        self.student_ids = np.empty(capacity, dtype=object)
+        self.study_style_ids = np.empty(capacity, dtype=np.int32)
+        self.vibe_ids = np.empty(capacity, dtype=np.int32)
+        self.subjects = TokenRows(capacity)
+        self.availability = TokenRows(capacity)
+        self.goals = TokenRows(capacity)
+
+    def append(self, profile: StudentProfile) -> None:
+        row = self.size
+        self.student_ids = _grown(self.student_ids, row + 1)
+        self.study_style_ids = _grown(self.study_style_ids, row + 1)
+        self.vibe_ids = _grown(self.vibe_ids, row + 1)
+
+        self.student_ids[row] = profile.student_id
+        self.study_style_ids[row] = profile._study_style_id
+        self.vibe_ids[row] = profile._vibe_id
+        self.subjects.append(profile._subjects_set)
+        self.availability.append(profile._availability_set)
+        self.goals.append(profile._goals_words)
+        self.size += 1
+
+    def best_row(self, seeker: StudentProfile) -> Optional[int]:
+        """Row with the highest compute_match_score against `seeker`, if any."""
+        n = self.size
+        if n == 0:
+            return None
+
+        scores = 2 * self.subjects.overlap(seeker._subjects_set)
+        scores += self.availability.overlap(seeker._availability_set)
+        scores += 3 * (self.study_style_ids[:n] == seeker._study_style_id)
+        scores += 2 * (self.vibe_ids[:n] == seeker._vibe_id)
+        scores += self.goals.overlap(seeker._goals_words) > 0
+
+        # never match someone with themselves (e.g. a re-registration)
+        scores[self.student_ids[:n] == seeker.student_id] = -1
+
+        # argmax returns the first maximum, same tie-break as the old loop
+        best = int(np.argmax(scores))
+        if scores[best] < 0:
+            return None
+        return best
+
+
+profile_store = ProfileStore()
+
+
+def find_best_match(seeker: StudentProfile) -> Optional[StudentProfile]:
+    """Vectorized equivalent of taking the max compute_match_score over the pool."""
+    row = profile_store.best_row(seeker)
+    if row is None:
+        return None
+    return registered_students[row]
+
+
 def find_student(student_id: str) -> Optional[StudentProfile]:
-    for s in registered_students:
-        if s.student_id == student_id:
-            return s
-    return None
+    return students_by_id.get(student_id)
 
 
 def make_chat_id(a_id: str, b_id: str) -> str:
     # stable chat id for a pair of students
-    return "-".join(sorted([a_id, b_id]))
+    return f"{a_id}-{b_id}" if a_id < b_id else f"{b_id}-{a_id}"
 
 
 
 def compute_match_score(a: StudentProfile, b: StudentProfile) -> int:
+    # +3 same study style, +2 same vibe, +2 per shared subject, +1 per shared
+    # availability slot, +1 if any goal word is shared (all case-insensitive,
+    # whole comma/space separated tokens). ProfileStore.best_row must agree.
     score = 0
 
-    if a.study_style.lower() == b.study_style.lower():
+    if a._study_style_id == b._study_style_id:
         score += 3
-    if a.vibe.lower() == b.vibe.lower():
+    if a._vibe_id == b._vibe_id:
         score += 2
 
-    for subject in a.subjects.lower().split(","):
-        subject = subject.strip()
-        if subject and subject in b.subjects.lower():
-            score += 2
+    score += 2 * len(a._subjects_set & b._subjects_set)
+    score += len(a._availability_set & b._availability_set)
 
-    for slot in a.availability.lower().split(","):
-        slot = slot.strip()
-        if slot and slot in b.availability.lower():
-            score += 1
-
-    if any(word in b.goals.lower() for word in a.goals.lower().split()):
+    if a._goals_words & b._goals_words:
         score += 1
 
     return score
 
 
+# ---------- OpenAI micro-batching ----------
+AI_MODEL = "gpt-4o-mini"
+AI_INSTRUCTIONS = "You write concise, friendly text for college students."
+AI_MAX_BATCH = 16      # flush as soon as this many prompts are waiting
+AI_MAX_WAIT = 0.05     # ...or this many seconds after the first one arrived
+
+
+class AIBatcher:
+    """Groups prompts arriving within AI_MAX_WAIT and sends each batch with asyncio.gather."""
+
+    def __init__(self, model: str):
+        self.model = model
+        self._queue: "queue.Queue[tuple[str, Future]]" = queue.Queue()
+        self._loop = asyncio.new_event_loop()
+        threading.Thread(target=self._loop.run_forever, daemon=True).start()
+        threading.Thread(target=self._collect, daemon=True).start()
+
+    def submit(self, prompt: str) -> Future:
+        fut: Future = Future()
+        self._queue.put((prompt, fut))
+        return fut
+
+    def _collect(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + AI_MAX_WAIT
+            while len(batch) < AI_MAX_BATCH:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            asyncio.run_coroutine_threadsafe(self._flush(batch), self._loop)
+
+    async def _flush(self, batch: list[tuple[str, Future]]) -> None:
+        results = await asyncio.gather(
+            *(self._request(prompt) for prompt, _ in batch),
+            return_exceptions=True,
+        )
+        for (_, fut), result in zip(batch, results):
+            if isinstance(result, BaseException):
+                fut.set_exception(result)
+            else:
+                fut.set_result(result)
+
+    async def _request(self, prompt: str) -> str:
+        # stream the completion and hang up as soon as the Message: line is
+        # finished; anything the model writes after that is never used
+        text = ""
+        async with async_client.responses.stream(
+            model=self.model,
+            input=prompt,
+            instructions=AI_INSTRUCTIONS,
+        ) as stream:
+            async for event in stream:
+                if event.type == "response.output_text.delta":
+                    text += event.delta
+                    if _reply_complete(text):
+                        await stream.close()
+                        break
+        return text
+
+
+def _reply_complete(text: str) -> bool:
+    # safe to hang up only once a non-empty Reason: line and a non-empty
+    # Message: line have both been finished by a newline; anything else
+    # (label on its own line, missing label, ...) is read to the end
+    done = set()
+    for m in _AI_RE.finditer(text):
+        if m.group(2).strip() and text.startswith("\n", m.end()):
+            done.add(m.group(1).lower())
+    return len(done) == 2
+
+
+# one batcher per model name, created on first use
+_batchers: dict[str, AIBatcher] = {}
+_batchers_lock = threading.Lock()
+
+
+def get_batcher(model: str = AI_MODEL) -> AIBatcher:
+    with _batchers_lock:
+        batcher = _batchers.get(model)
+        if batcher is None:
+            batcher = _batchers[model] = AIBatcher(model)
+        return batcher
+
+
+# ---------- AI result cache ----------
+AI_CACHE_SIZE = 4096
+
+# (seeker_key, buddy_key, seeker_name, buddy_name) -> {"reason", "message"}
+_ai_cache: "OrderedDict[tuple[str, str, str, str], dict]" = OrderedDict()
+_ai_cache_lock = threading.Lock()
+
+
+def profile_key(p: StudentProfile) -> str:
+    # content hash of what the prompt is really about; names and ids are left
+    # out so identical profiles (resubmits, re-signups) share cache entries
+    body = repr((p.study_style, p.vibe, p.subjects, p.availability, p.goals, p.major, p.year))
+    return hashlib.blake2b(body.encode(), digest_size=16).hexdigest()
+
+
 def generate_ai_explanation_and_intro(
     seeker: StudentProfile, buddy: StudentProfile
 ) -> dict:
-    prompt = f"""
+    return generate_many([(seeker, buddy)])[0]
+
+
+def generate_many(pairs: list[tuple[StudentProfile, StudentProfile]]) -> list[dict]:
+    # submit every uncached prompt before waiting on any, so they share a batch
+    results: list[Optional[dict]] = [None] * len(pairs)
+    pending: list[tuple[int, tuple[str, str, str, str], Future]] = []
+    batcher = get_batcher(AI_MODEL)
+
+    for i, (seeker, buddy) in enumerate(pairs):
+        key = (profile_key(seeker), profile_key(buddy), seeker.name, buddy.name)
+        with _ai_cache_lock:
+            cached = _ai_cache.get(key)
+            if cached is not None:
+                _ai_cache.move_to_end(key)
+                results[i] = dict(cached)
+                continue
+        pending.append((i, key, batcher.submit(_build_prompt(seeker, buddy))))
+
+    for i, key, fut in pending:
+        try:
+            result = _parse_ai_reply(fut.result())
+        except Exception:
+            # not cached, so the next attempt goes back to OpenAI
+            buddy = pairs[i][1]
+            results[i] = {
+                "reason": "You share similar study styles and subjects, so you’d probably work well together.",
+                "message": f"Hey {buddy.name}, I saw we match on StudySync and we’re studying some of the same stuff. Want to team up for a session?",
+            }
+            continue
+
+        with _ai_cache_lock:
+            _ai_cache[key] = result
+            _ai_cache.move_to_end(key)
+            if len(_ai_cache) > AI_CACHE_SIZE:
+                _ai_cache.popitem(last=False)
+        results[i] = dict(result)
+
+    return results
+
+
+def _build_prompt(seeker: StudentProfile, buddy: StudentProfile) -> str:
+    return f"""
 You are helping match students as study buddies.
 
 Student A (the one looking for a buddy):
@@ -128,36 +468,35 @@ Reason: <one sentence>
 Message: <one or two sentences>
 """
 
-    try:
-        response = client.responses.create(
-            model="gpt-4o-mini",
-            input=prompt,
-            instructions="You write concise, friendly text for college students.",
-        )
 
-        full_text = response.output_text
 
-        reason = ""
-        message = ""
+# "Reason: ..." / "Message: ..." lines in the model's reply
+_AI_RE = re.compile(r"^(reason|message)[ \t]*:[ \t]*(.*)$", re.IGNORECASE | re.MULTILINE)
 
-        for line in full_text.splitlines():
-            if line.lower().startswith("reason:"):
-                reason = line.split(":", 1)[1].strip()
-            elif line.lower().startswith("message:"):
-                message = line.split(":", 1)[1].strip()
 
-        if not reason:
-            reason = full_text.strip()
+def _parse_ai_reply(full_text: str) -> dict:
+    reason = ""
+    message = ""
 
-        return {
-            "reason": reason,
-            "message": message or full_text.strip(),
-        }
-    except Exception:
-        return {
-            "reason": "You share similar study styles and subjects, so you’d probably work well together.",
-            "message": f"Hey {buddy.name}, I saw we match on StudySync and we’re studying some of the same stuff. Want to team up for a session?",
-        }
+    matches = list(_AI_RE.finditer(full_text))
+    for i, m in enumerate(matches):
+        value = m.group(2).strip()
+        if not value:
+            # label on its own line: the value is what follows, up to the next label
+            end = matches[i + 1].start() if i + 1 < len(matches) else len(full_text)
+            value = full_text[m.end():end].strip()
+        if m.group(1).lower() == "reason":
+            reason = value
+        else:
+            message = value
+
+    if not reason:
+        reason = full_text.strip()
+
+    return {
+        "reason": reason,
+        "message": message or full_text.strip(),
+    }
 
 
 @app.route("/", methods=["GET"])
@@ -165,6 +504,21 @@ def index():
     return render_template("index.html")
 
 
+@app.route("/u/<path:fname>", methods=["GET"])
+def uploaded_photo(fname: str):
+    # in-progress writes live under dot-prefixed temp names; never serve (and
+    # so never cache) those, only the completed file renamed into place
+    if os.path.basename(fname).startswith("."):
+        abort(404)
+
+    # upload names are unique per file ({student_id}_{uuid8}{ext}) and only
+    # appear once fully written, so browsers can keep them forever
+    response = send_from_directory(app.config["UPLOAD_FOLDER"], fname, max_age=31536000)
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    return response
+
+
 @app.route("/match", methods=["POST"])
 def match():
     # ---- Form fields ----
@@ -181,19 +535,27 @@ def match():
     # ---- File upload handling ----
     photo_file = request.files.get("photo")
     photo_filename = ""
-
-    if photo_file and allowed_file(photo_file.filename):
-        original_name = secure_filename(photo_file.filename)
-        _, ext = os.path.splitext(original_name)
-
+    photo_warning = None
+
+    ext = parse_upload(photo_file) if photo_file else None
+    # the upload stream is closed once the request ends, so grab the bytes now
+    # and let the pool do the actual write; read one byte past the limit to
+    # tell "exactly at the limit" from "too large" without buffering it all
+    photo_data = photo_file.read(MAX_PHOTO_BYTES + 1) if ext else b""
+    if len(photo_data) > MAX_PHOTO_BYTES:
+        photo_data = b""
+        photo_warning = f"Your photo was larger than {MAX_PHOTO_BYTES // (1024 * 1024)} MB, so it wasn't saved."
+
+    # only keep files whose contents really are one of the allowed image types
+    if photo_data.startswith(IMAGE_SIGNATURES):
         # Unique filename: USF ID + random tag + extension
         unique_tag = uuid.uuid4().hex[:8]
-        safe_name = f"{student_id}_{unique_tag}{ext.lower()}"
+        safe_name = secure_filename(f"{student_id}_{unique_tag}.{ext}")
 
         photo_path = os.path.join(app.config["UPLOAD_FOLDER"], safe_name)
-        photo_file.save(photo_path)
+        write = io_pool.submit(_write_upload, photo_path, photo_data)
+        write.add_done_callback(functools.partial(_log_upload_result, photo_path))
         photo_filename = safe_name
-        print("Saved photo as:", photo_filename)
 
     # ---- Build this student's profile ----
     seeker = StudentProfile(
@@ -210,29 +572,26 @@ def match():
     )
 
     # ---- Find best match ----
-    best_match: Optional[StudentProfile] = None
-    best_score = -1
-
-    for other in registered_students:
-        if other.student_id == seeker.student_id:
-            continue
-
-        score = compute_match_score(seeker, other)
-        if score > best_score:
-            best_score = score
-            best_match = other
+    with registry_lock:
+        best_match = find_best_match(seeker)
 
     ai_result = None
     if best_match:
         ai_result = generate_ai_explanation_and_intro(seeker, best_match)
 
     # ---- Save this student ----
-    registered_students.append(seeker)
+    with registry_lock:
+        registered_students.append(seeker)
+        students_by_id[seeker.student_id] = seeker
+        all_ids.append(seeker.student_id)
+        profile_store.append(seeker)
+        num_others = len(registered_students) - 1
 
     # DEBUG: see what filenames we have
-    print(">>> seeker:", seeker.student_id, seeker.name, "photo:", seeker.photo_filename)
-    if best_match:
-        print(">>> best_match:", best_match.student_id, best_match.name, "photo:", best_match.photo_filename)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(">>> seeker: %s %s photo: %s", seeker.student_id, seeker.name, seeker.photo_filename)
+        if best_match:
+            logger.debug(">>> best_match: %s %s photo: %s", best_match.student_id, best_match.name, best_match.photo_filename)
 
     # ---- Render result page ----
     return render_template(
@@ -240,7 +599,8 @@ def match():
     seeker=seeker,
     best_match=best_match,
     ai_result=ai_result,
-    num_others=len(registered_students) - 1,
+    num_others=num_others,
+    photo_warning=photo_warning,
     )
 @app.route("/swipe/<student_id>", methods=["GET", "POST"])
 def swipe(student_id: str):
@@ -249,8 +609,9 @@ def swipe(student_id: str):
         return "Student not found. Make sure you signed up first.", 404
 
     # ensure sets exist
-    likes = likes_by_user.setdefault(student_id, set())
-    passes = passes_by_user.setdefault(student_id, set())
+    with registry_lock:
+        likes = likes_by_user.setdefault(student_id, set())
+        passes = passes_by_user.setdefault(student_id, set())
 
     message = None
     matched_with: Optional[StudentProfile] = None
@@ -265,11 +626,17 @@ def swipe(student_id: str):
             target_student = find_student(target_id)
 
             if action == "like":
-                likes.add(target_id)
+                with registry_lock:
+                    likes.add(target_id)
+                    liked_by.setdefault(target_id, {})[student_id] = None
+                    other_likes = likes_by_user.setdefault(target_id, set())
+                    is_mutual = student_id in other_likes
+                    if is_mutual:
+                        mutuals_by_user.setdefault(student_id, set()).add(target_id)
+                        mutuals_by_user.setdefault(target_id, set()).add(student_id)
 
                 # did they already like you?
-                other_likes = likes_by_user.setdefault(target_id, set())
-                if student_id in other_likes:
+                if is_mutual:
                     # MUTUAL MATCH 🎉
                     matched_with = target_student
                     message = f"It's a match with {matched_with.name}! 🎉 You can start chatting."
@@ -281,19 +648,23 @@ def swipe(student_id: str):
                     else:
                         message = "Match request sent."
             elif action == "pass":
-                passes.add(target_id)
+                with registry_lock:
+                    passes.add(target_id)
                 if target_student:
                     message = f"You skipped {target_student.name}."
 
     # pick the next candidate to show
+    # everything before the cursor is us or already swiped on, so only scan forward
     candidate: Optional[StudentProfile] = None
-    for other in registered_students:
-        if other.student_id == student_id:
-            continue
-        if other.student_id in likes or other.student_id in passes:
-            continue
-        candidate = other
-        break
+    with registry_lock:
+        pos = cursor_by_user.get(student_id, 0)
+        while pos < len(all_ids):
+            other_id = all_ids[pos]
+            if other_id != student_id and other_id not in likes and other_id not in passes:
+                candidate = find_student(other_id)
+                break
+            pos += 1
+        cursor_by_user[student_id] = pos
 
     return render_template(
         "swipe.html",
@@ -317,18 +688,20 @@ def chat(chat_id: str):
     if not current or not other:
         return "Student(s) not found.", 404
 
-    messages = chats.setdefault(chat_id, [])
+    with registry_lock:
+        messages = chats.setdefault(chat_id, [])
 
     if request.method == "POST":
         text = request.form.get("text", "").strip()
         if text:
-            messages.append(
-                {
-                    "sender_id": current.student_id,
-                    "sender_name": current.name,
-                    "text": text,
-                }
-            )
+            with registry_lock:
+                messages.append(
+                    {
+                        "sender_id": current.student_id,
+                        "sender_name": current.name,
+                        "text": text,
+                    }
+                )
         # avoid form resubmit on refresh
         return render_template(
             "chat.html",
@@ -373,27 +746,21 @@ def dashboard(student_id: str):
 
     my_id = current.student_id
 
-    # likes I sent
-    my_likes = likes_by_user.get(my_id, set())
+    with registry_lock:
+        # likes I sent
+        my_likes = likes_by_user.get(my_id, set())
 
-    # incoming requests = people who liked me, but I never liked them back
-    incoming_requests_ids = []
-    for other_id, their_likes in likes_by_user.items():
-        if other_id == my_id:
-            continue
-        if my_id in their_likes and other_id not in my_likes:
-            incoming_requests_ids.append(other_id)
+        # people who liked me
+        their_likes = liked_by.get(my_id, {})
 
-    incoming_requests = [find_student(sid) for sid in incoming_requests_ids if find_student(sid)]
+        # incoming requests = people who liked me, but I never liked them back
+        incoming_requests_ids = [sid for sid in their_likes if sid not in my_likes]
 
-    # mutual matches = we both liked each other
-    mutual_ids = []
-    for other_id in my_likes:
-        other_likes = likes_by_user.get(other_id, set())
-        if my_id in other_likes:
-            mutual_ids.append(other_id)
+        # mutual matches = we both liked each other
+        mutual_ids = tuple(mutuals_by_user.get(my_id, ()))
 
-    mutual_matches = [find_student(sid) for sid in mutual_ids if find_student(sid)]
+    incoming_requests = [s for sid in incoming_requests_ids if (s := students_by_id.get(sid))]
+    mutual_matches = [students_by_id[sid] for sid in mutual_ids]
 
     return render_template(
         "dashboard.html",
@@ -415,8 +782,13 @@ def accept_match():
         return "Student not found.", 404
 
     # Like them back
-    my_likes = likes_by_user.setdefault(me_id, set())
-    my_likes.add(other_id)
+    with registry_lock:
+        my_likes = likes_by_user.setdefault(me_id, set())
+        my_likes.add(other_id)
+        liked_by.setdefault(other_id, {})[me_id] = None
+        if me_id in likes_by_user.get(other_id, ()):
+            mutuals_by_user.setdefault(me_id, set()).add(other_id)
+            mutuals_by_user.setdefault(other_id, set()).add(me_id)
 
     # Now it's a mutual match, create chat ID
     chat_id = make_chat_id(me_id, other_id)
@@ -0,0 +1,4 @@
+import os
+
+# app.py builds its OpenAI client at import time; tests never hit the API
+os.environ.setdefault("OPENAI_API_KEY", "test")
@@ -0,0 +1,20 @@
+import pytest
+
+import app as app_module
+
+
+@pytest.fixture
+def client(monkeypatch):
+    # fresh in-memory registry per test, and no OpenAI traffic
+    for name in (
+        "registered_students", "students_by_id", "likes_by_user", "liked_by",
+        "mutuals_by_user", "passes_by_user", "all_ids", "cursor_by_user", "chats",
+    ):
+        monkeypatch.setattr(app_module, name, type(getattr(app_module, name))())
+    monkeypatch.setattr(app_module, "profile_store", app_module.ProfileStore())
+    monkeypatch.setattr(
+        app_module,
+        "generate_ai_explanation_and_intro",
+        lambda seeker, buddy: {"reason": "r", "message": "m"},
+    )
+    return app_module.app.test_client()
@@ -0,0 +1,75 @@
+import pytest
+
+from app import _parse_ai_reply, _reply_complete
+
+
+def stream(text: str) -> str:
+    # feed the reply one character at a time, the way AIBatcher._request sees
+    # deltas, and return what was received when the stream would be closed
+    buf = ""
+    for ch in text:
+        buf += ch
+        if _reply_complete(buf):
+            break
+    return buf
+
+
+@pytest.mark.parametrize(
+    "reply, reason, message",
+    [
+        (
+            "Reason: You both like calc.\nMessage: Hey Sam, want to study?\n",
+            "You both like calc.",
+            "Hey Sam, want to study?",
+        ),
+        (
+            "Reason: You both like calc.\nMessage:\nHey Sam, want to study?\nSee you!",
+            "You both like calc.",
+            "Hey Sam, want to study?\nSee you!",
+        ),
+        (
+            "Message: Hey Sam, want to study?\nReason: You both like calc.\n",
+            "You both like calc.",
+            "Hey Sam, want to study?",
+        ),
+        (
+            "Reason: Your message: style matches.\nMessage: Hey Sam!\n",
+            "Your message: style matches.",
+            "Hey Sam!",
+        ),
+        (
+            "reason : Same classes.\nMESSAGE: Hi!",
+            "Same classes.",
+            "Hi!",
+        ),
+    ],
+)
+def test_early_stop_keeps_both_lines(reply, reason, message):
+    assert _parse_ai_reply(reply) == {"reason": reason, "message": message}
+    assert _parse_ai_reply(stream(reply)) == {"reason": reason, "message": message}
+
+
+def test_stream_closes_once_message_line_ends():
+    reply = "Reason: Same classes.\nMessage: Hi!\nP.S. anything else is dropped"
+    assert stream(reply) == "Reason: Same classes.\nMessage: Hi!\n"
+
+
+@pytest.mark.parametrize(
+    "partial",
+    [
+        "Reason: Same classes.\nMessage:\n",
+        "Message: Hi!\nReason:",
+        "Message: Hi!\nReason: Same",
+        "Reason: Your message: style\n",
+        "Reason:\nMessage: Hi!\n",
+    ],
+)
+def test_incomplete_replies_keep_streaming(partial):
+    assert not _reply_complete(partial)
+
+
+def test_unlabelled_reply_falls_back_to_full_text():
+    assert _parse_ai_reply("  Just study together!  ") == {
+        "reason": "Just study together!",
+        "message": "Just study together!",
+    }
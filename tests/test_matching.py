@@ -0,0 +1,62 @@
+import random
+
+from app import ProfileStore, StudentProfile, compute_match_score
+
+SUBJECTS = ["calc 2", "physics", "chemistry", "biology", "data structures", "art history"]
+SLOTS = ["mon", "tue", "wed", "thu", "fri", "weekends"]
+STYLES = ["Quiet and focused", "quiet and focused", "Last-minute sprint", ""]
+VIBES = ["Chill and calm", "High-energy and intense", ""]
+GOALS = ["ace the final", "pass calc", "get an A", "finish homework early", ""]
+
+
+def random_profile(rng: random.Random, student_id: str) -> StudentProfile:
+    return StudentProfile(
+        student_id=student_id,
+        name=f"Student {student_id}",
+        major="CS",
+        year="Junior",
+        study_style=rng.choice(STYLES),
+        vibe=rng.choice(VIBES),
+        subjects=", ".join(rng.sample(SUBJECTS, rng.randint(0, 3))),
+        availability=",".join(rng.sample(SLOTS, rng.randint(0, 3))),
+        goals=rng.choice(GOALS),
+    )
+
+
+def test_best_row_matches_scalar_scorer():
+    rng = random.Random(0)
+    store = ProfileStore(capacity=1)
+    pool: list[StudentProfile] = []
+
+    for i in range(300):
+        # reuse some ids so re-registrations are covered too
+        seeker = random_profile(rng, f"U{i % 250}")
+
+        expected = None
+        best_score = -1
+        for row, other in enumerate(pool):
+            if other.student_id == seeker.student_id:
+                continue
+            score = compute_match_score(seeker, other)
+            if score > best_score:
+                best_score = score
+                expected = row
+
+        assert store.best_row(seeker) == expected
+
+        pool.append(seeker)
+        store.append(seeker)
+
+
+def test_empty_store_has_no_match():
+    store = ProfileStore(capacity=1)
+    assert store.best_row(random_profile(random.Random(1), "U1")) is None
+
+
+def test_store_grows_from_zero_capacity():
+    rng = random.Random(2)
+    store = ProfileStore(capacity=0)
+    for i in range(5):
+        store.append(random_profile(rng, f"U{i}"))
+    assert store.size == 5
+    assert store.best_row(random_profile(rng, "U9")) is not None
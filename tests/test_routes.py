@@ -0,0 +1,131 @@
+import random
+import re
+
+import app
+
+
+def sign_up(client, student_id, **fields):
+    data = {"student_id": student_id, "name": f"Student {student_id}"}
+    data.update(fields)
+    resp = client.post("/match", data=data, content_type="multipart/form-data")
+    assert resp.status_code == 200
+    return resp
+
+
+def like(client, student_id, target_id):
+    return client.post(f"/swipe/{student_id}", data={"action": "like", "target_id": target_id})
+
+
+def incoming_names(client, student_id):
+    html = client.get(f"/dashboard/{student_id}").get_data(as_text=True)
+    section = html.split("Incoming match requests", 1)[1].split("Your matches", 1)[0]
+    return re.findall(r"<strong>(.+?)</strong>", section)
+
+
+def test_incoming_requests_keep_like_order(client):
+    for sid in ("U0", "U1", "U2", "U3", "U4"):
+        sign_up(client, sid)
+    for sid in ("U3", "U1", "U4", "U2"):
+        like(client, sid, "U0")
+
+    assert incoming_names(client, "U0") == ["Student U3", "Student U1", "Student U4", "Student U2"]
+
+
+def candidate(resp):
+    m = re.search(r'name="target_id" value="([^"]+)"', resp.get_data(as_text=True))
+    return m and m.group(1)
+
+
+def mutual_names(client, student_id):
+    html = client.get(f"/dashboard/{student_id}").get_data(as_text=True)
+    section = html.split("Your matches", 1)[1]
+    return re.findall(r"<strong>(.+?)</strong>", section)
+
+
+def test_swipe_skips_liked_and_passed(client):
+    for sid in ("U0", "U1", "U2", "U3"):
+        sign_up(client, sid)
+
+    assert candidate(client.get("/swipe/U0")) == "U1"
+    assert candidate(like(client, "U0", "U1")) == "U2"
+    resp = client.post("/swipe/U0", data={"action": "pass", "target_id": "U2"})
+    assert candidate(resp) == "U3"
+    # nothing swiped comes back on a fresh page load
+    assert candidate(client.get("/swipe/U0")) == "U3"
+
+
+def test_later_sign_ups_become_visible(client):
+    sign_up(client, "U0")
+    sign_up(client, "U1")
+    like(client, "U0", "U1")
+    assert candidate(client.get("/swipe/U0")) is None
+
+    sign_up(client, "U2")
+    assert candidate(client.get("/swipe/U0")) == "U2"
+
+
+def test_re_registration_shows_latest_profile_once(client):
+    sign_up(client, "U0")
+    sign_up(client, "U1", name="Old name")
+    sign_up(client, "U2")
+    sign_up(client, "U1", name="New name")
+
+    resp = client.get("/swipe/U0")
+    assert candidate(resp) == "U1"
+    assert "New name" in resp.get_data(as_text=True)
+    assert candidate(like(client, "U0", "U1")) == "U2"
+    assert candidate(like(client, "U0", "U2")) is None
+
+    # the re-registered user never sees themselves either
+    assert candidate(client.get("/swipe/U1")) == "U0"
+    assert candidate(like(client, "U1", "U0")) == "U2"
+
+
+def test_mutual_match_through_swipe(client):
+    sign_up(client, "U0")
+    sign_up(client, "U1")
+
+    assert "Match request sent" in like(client, "U0", "U1").get_data(as_text=True)
+    assert "It&#39;s a match" in like(client, "U1", "U0").get_data(as_text=True)
+    assert mutual_names(client, "U0") == ["Student U1"]
+    assert mutual_names(client, "U1") == ["Student U0"]
+    assert incoming_names(client, "U0") == []
+
+
+def test_mutual_match_through_accept(client):
+    sign_up(client, "U0")
+    sign_up(client, "U1")
+    like(client, "U1", "U0")
+    assert incoming_names(client, "U0") == ["Student U1"]
+
+    resp = client.post("/accept_match", data={"me_id": "U0", "other_id": "U1"})
+    assert resp.status_code == 302
+    assert "/chat/U0-U1" in resp.headers["Location"]
+    assert incoming_names(client, "U0") == []
+    assert mutual_names(client, "U0") == ["Student U1"]
+    assert mutual_names(client, "U1") == ["Student U0"]
+
+
+def test_dashboard_matches_baseline_intersection(client):
+    rng = random.Random(0)
+    ids = [f"U{i}" for i in range(12)]
+    for sid in ids:
+        sign_up(client, sid)
+    for _ in range(60):
+        me, other = rng.sample(ids, 2)
+        if rng.random() < 0.8:
+            like(client, me, other)
+        else:
+            client.post("/accept_match", data={"me_id": me, "other_id": other})
+
+    for me in ids:
+        my_likes = app.likes_by_user.get(me, set())
+        # the pre-index dashboard logic: scan everyone's likes
+        incoming = {
+            other for other, theirs in app.likes_by_user.items()
+            if other != me and me in theirs and other not in my_likes
+        }
+        mutual = {other for other in my_likes if me in app.likes_by_user.get(other, set())}
+
+        assert set(incoming_names(client, me)) == {f"Student {sid}" for sid in incoming}
+        assert sorted(mutual_names(client, me)) == sorted(f"Student {sid}" for sid in mutual)
@@ -0,0 +1,27 @@
+import io
+
+import app
+
+
+def sign_up(client, student_id, photo):
+    return client.post(
+        "/match",
+        data={"student_id": student_id, "name": f"Student {student_id}", "photo": photo},
+        content_type="multipart/form-data",
+    )
+
+
+def test_oversized_photo_is_dropped_but_sign_up_succeeds(client):
+    big = b"\xff\xd8\xff" + b"0" * app.MAX_PHOTO_BYTES
+    resp = sign_up(client, "U1", (io.BytesIO(big), "me.jpg"))
+
+    assert resp.status_code == 200
+    assert b"wasn&#39;t saved" in resp.data
+    assert app.find_student("U1").photo_filename == ""
+
+
+def test_non_image_contents_are_dropped(client):
+    resp = sign_up(client, "U2", (io.BytesIO(b"<html></html>"), "me.png"))
+
+    assert resp.status_code == 200
+    assert app.find_student("U2").photo_filename == ""